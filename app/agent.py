@@ -1,8 +1,12 @@
-from typing import Dict, Any, List, Optional
-from pydantic import BaseModel
+from typing import Dict, Any, List, Optional, AsyncIterator
+from collections import OrderedDict
+from pydantic import BaseModel, PrivateAttr
 import os
-import json
-from openai import AsyncOpenAI
+import hashlib
+import orjson
+import numpy as np
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, InternalServerError
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 class TradingInsight(BaseModel):
     summary: str
@@ -10,13 +14,138 @@ class TradingInsight(BaseModel):
     confidence: float
     reasoning: List[str]
     data: Optional[Dict[str, Any]] = None
+    # Set on the fallback returned when generation fails; not part of the response
+    _failed: bool = PrivateAttr(default=False)
+
+    @property
+    def failed(self) -> bool:
+        return self._failed
+
+# Row fields that are positions/labels rather than measurements
+_NON_SERIES_FIELDS = {"timestamp", "settlement_date", "settlement_period"}
+
+# Fetch metadata that changes on every call; kept out of the cache key
+_VOLATILE_FIELDS = {"updated_at"}
+
+def _downsample(values: np.ndarray, n: int = 48) -> np.ndarray:
+    """
+    Reduce a series to at most n points, keeping the min and max of each bucket
+    (in time order) so price spikes survive the reduction.
+    """
+    if len(values) <= n:
+        return values
+    picked = []
+    for bucket in np.array_split(np.arange(len(values)), max(1, n // 2)):
+        lo = bucket[np.argmin(values[bucket])]
+        hi = bucket[np.argmax(values[bucket])]
+        picked.extend(sorted({lo, hi}))
+    return values[picked]
+
+def _summarize(market_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compress the hourly "data" rows into summary statistics per numeric field
+    plus a short downsampled series, so the prompt size no longer grows with
+    the number of data points.
+    Other top-level keys are passed through unchanged.
+    """
+    rows = market_data.get("data")
+    if not isinstance(rows, list) or not rows or not isinstance(rows[0], dict):
+        return market_data
+
+    summary = {k: v for k, v in market_data.items() if k != "data"}
+    summary["points"] = len(rows)
+    for label in ("timestamp", "settlement_date"):
+        if label in rows[0]:
+            summary["start"] = rows[0][label]
+            summary["end"] = rows[-1][label]
+            break
+
+    fields = [
+        k for k in rows[0]
+        if k not in _NON_SERIES_FIELDS and any(
+            isinstance(r.get(k), (int, float)) and not isinstance(r.get(k), bool) for r in rows
+        )
+    ]
+    stats = {}
+    for field in fields:
+        arr = np.array([r[field] for r in rows if r.get(field) is not None], dtype=np.float64)
+        if not arr.size:
+            continue
+        p25, p75 = np.percentile(arr, [25, 75])
+        stats[field] = {
+            "min": round(float(arr.min()), 2),
+            "max": round(float(arr.max()), 2),
+            "mean": round(float(arr.mean()), 2),
+            "std": round(float(arr.std()), 2),
+            "p25": round(float(p25), 2),
+            "p75": round(float(p75), 2),
+            "first": round(float(arr[0]), 2),
+            "last": round(float(arr[-1]), 2),
+            "sample": np.round(_downsample(arr, 10), 2).tolist()
+        }
+    summary["stats"] = stats
+    return summary
 
 class EnergyAgent:
     """
     Agent that analyzes energy market data and generates trading insights.
+    Insights are cached in memory (LRU) by a hash of the market data, so
+    re-analyzing identical data skips the LLM call.
     """
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    _SYSTEM = "You are a helpful assistant that outputs JSON."
+    _USER_TEMPLATE = """
+        You are an expert Energy Trading AI. Analyze the following market data and provide a trading recommendation.
+        
+        Market Data (summary statistics):
+        {payload}
+        
+        Provide your response in JSON format with the following keys:
+        - summary: A brief summary of the market situation.
+        - action: BUY, SELL, or HOLD.
+        - confidence: A float between 0.0 and 1.0.
+        - reasoning: A list of strings explaining your decision.
+        """
+
+    def __init__(self, cache_size: int = 256):
+        # Retries are handled by _complete() with exponential backoff
+        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=20.0, max_retries=0)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, TradingInsight] = OrderedDict()
+
+    @staticmethod
+    def _cache_key(market_data: Dict[str, Any]) -> str:
+        stable = {k: v for k, v in market_data.items() if k not in _VOLATILE_FIELDS}
+        canonical = orjson.dumps(stable, default=str, option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(canonical).hexdigest()
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(min=1, max=8),
+        retry=retry_if_exception_type((RateLimitError, APIConnectionError, InternalServerError)),
+        reraise=True
+    )
+    async def _complete(self, prompt: str, stream: bool = False):
+        """
+        Run the chat completion, retrying transient failures (429, 5xx, timeouts).
+        With stream=True only opening the stream is retried.
+        """
+        return await self.client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": self._SYSTEM},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            # The reply is a short JSON object; cap decode length and keep it near-deterministic
+            max_tokens=300,
+            temperature=0.3,
+            stream=stream
+        )
+
+    def _remember(self, key: str, insight: TradingInsight):
+        self._cache[key] = insight
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
 
     async def analyze(self, market_data: Dict[str, Any]) -> TradingInsight:
         """
@@ -25,7 +154,11 @@ class EnergyAgent:
         # If no API key, fallback to mock
         if not os.getenv("OPENAI_API_KEY"):
              prices = market_data.get("data", [])
-             avg_price = sum(p.get("price", 0) for p in prices) / len(prices) if prices else 0
+             prices_arr = np.fromiter(
+                 (p["price"] for p in prices if p.get("price") is not None),
+                 dtype=np.float64
+             )
+             avg_price = prices_arr.mean() if prices_arr.size else 0.0
              return TradingInsight(
                 summary=f"Analyzed {len(prices)} data points. Average price: {avg_price:.2f} (MOCK - Set OPENAI_API_KEY for real AI)",
                 action="HOLD",
@@ -34,42 +167,70 @@ class EnergyAgent:
                 data=market_data
             )
 
-        prompt = f"""
-        You are an expert Energy Trading AI. Analyze the following market data and provide a trading recommendation.
-        
-        Market Data:
-        {json.dumps(market_data, default=str)}
-        
-        Provide your response in JSON format with the following keys:
-        - summary: A brief summary of the market situation.
-        - action: BUY, SELL, or HOLD.
-        - confidence: A float between 0.0 and 1.0.
-        - reasoning: A list of strings explaining your decision.
-        """
+        key = self._cache_key(market_data)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached.model_copy(update={"data": market_data})
 
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that outputs JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"}
-            )
+            # Built inside the try: a malformed series falls back like a failed call
+            payload = orjson.dumps(_summarize(market_data), default=str).decode()
+            prompt = self._USER_TEMPLATE.format(payload=payload)
+            response = await self._complete(prompt)
             
             content = response.choices[0].message.content
-            result = json.loads(content)
+            result = orjson.loads(content)
             
             # Attach raw data to the result
             result["data"] = market_data
             
-            return TradingInsight(**result)
+            insight = TradingInsight(**result)
+            self._remember(key, insight)
+            return insight
             
         except Exception as e:
-            return TradingInsight(
+            insight = TradingInsight(
                 summary=f"Error generating insight: {str(e)}",
                 action="HOLD",
                 confidence=0.0,
                 reasoning=["AI generation failed."],
                 data=market_data
             )
+            insight._failed = True
+            return insight
+
+    async def analyze_stream(self, market_data: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Stream the insight JSON text as the model generates it.
+        Cached and fallback insights are yielded as a single chunk.
+        """
+        key = self._cache_key(market_data)
+        cached = self._cache.get(key)
+        if not os.getenv("OPENAI_API_KEY") or cached is not None:
+            insight = await self.analyze(market_data)
+            yield insight.model_dump_json(exclude={"data"})
+            return
+
+        try:
+            payload = orjson.dumps(_summarize(market_data), default=str).decode()
+            prompt = self._USER_TEMPLATE.format(payload=payload)
+            response = await self._complete(prompt, stream=True)
+            parts = []
+            async for chunk in response:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content or ""
+                parts.append(content)
+                yield content
+        except Exception as e:
+            yield orjson.dumps({"error": f"Error generating insight: {str(e)}"}).decode()
+            return
+
+        # Cache the completed insight so the JSON endpoint can reuse it
+        try:
+            result = orjson.loads("".join(parts))
+            result["data"] = market_data
+            self._remember(key, TradingInsight(**result))
+        except Exception:
+            pass
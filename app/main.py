@@ -1,16 +1,33 @@
-from fastapi import FastAPI, HTTPException, Depends
+import asyncio
+import inspect
+import logging
+import time
+import pandas as pd
+import orjson
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from typing import Optional
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Literal
+from pydantic import BaseModel
+from cachetools import TTLCache
 
 from app.services.smard import SmardClient
 from app.services.elexon import ElexonClient
 from app.services.weather import WeatherClient
+from app.services.http import create_http_client
 from app.agent import EnergyAgent, TradingInsight
 
-from src.db.database import get_db, engine
+from src.db.database import get_db, engine, SessionLocal
 from src.db.models import Base, DayAheadPrice, EnergyNews, WeatherData
 from src.ingestion.gdelt import fetch_energy_news
+from src.ingestion.http import close_client as close_ingestion_client
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -22,16 +39,114 @@ elexon_client = ElexonClient()
 weather_client = WeatherClient()
 agent = EnergyAgent()
 
+# Insights per (source, date, minute bucket): bursts of requests within the same
+# minute share one upstream fetch + analysis; old buckets expire on their own
+INSIGHT_MEMO_SECONDS = 60
+_insight_memo = TTLCache(maxsize=32, ttl=INSIGHT_MEMO_SECONDS)
+
+def _memo_key(source: str, date: Optional[str] = None):
+    return (source, date, int(time.time() // INSIGHT_MEMO_SECONDS))
+
+def _memoize_insight(key, market_data: dict, insight: TradingInsight):
+    # Upstream fetch errors and failed generations are not reused
+    if "error" not in market_data and not insight.failed:
+        _insight_memo[key] = insight
+
+@app.on_event("startup")
+async def startup():
+    # One pooled HTTP client shared by all external data sources
+    app.state.http_client = create_http_client()
+    for service in (smard_client, elexon_client, weather_client):
+        service.attach_client(app.state.http_client)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await app.state.http_client.aclose()
+    await close_ingestion_client()
+    for service in (smard_client, elexon_client, weather_client):
+        service.detach_client()
+
+def _async_commit(db: Session):
+    """
+    Don't wait for the WAL flush when this transaction commits. Ingested market
+    data can be re-fetched, so losing the last moments of writes on a crash is
+    acceptable; other transactions keep full durability (SET LOCAL).
+    """
+    db.execute(text("SET LOCAL synchronous_commit = OFF"))
+
+def _persist_prices(rows: list):
+    """
+    Bulk insert day-ahead price rows in a separate session. Runs as a
+    background task after the response has been sent.
+    """
+    if not rows:
+        return
+    db = SessionLocal()
+    try:
+        _async_commit(db)
+        db.execute(
+            pg_insert(DayAheadPrice).values(rows).on_conflict_do_nothing(
+                index_elements=["timestamp", "zone"]
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+def _weather_point(ts: datetime, temp, wind, solar) -> dict:
+    """
+    Agent input row for one weather reading. Fresh API rows and stored rows
+    both go through here so the merged series uses one timestamp format.
+    """
+    return {
+        "timestamp": ts.replace(tzinfo=None).isoformat(),
+        "temp": temp,
+        "wind": wind,
+        "solar": solar
+    }
+
+def _load_weather_day(db: Session, day: datetime) -> dict:
+    """
+    Load stored weather rows for one calendar day, keyed by naive timestamp.
+    """
+    # Plain column tuples; no ORM entity hydration needed for a read-only projection
+    db_data = db.execute(
+        select(
+            WeatherData.timestamp,
+            WeatherData.temperature,
+            WeatherData.wind_speed,
+            WeatherData.solar_radiation
+        ).where(
+            WeatherData.timestamp >= day,
+            WeatherData.timestamp < day + timedelta(days=1)
+        )
+    ).all()
+    return {
+        ts.replace(tzinfo=None): _weather_point(ts, temp, wind, solar)
+        for ts, temp, wind, solar in db_data
+    }
+
 @app.get("/insights/weather")
 async def get_weather_insights(date: Optional[str] = None, skip_analysis: bool = False, db: Session = Depends(get_db)):
     # 1. Fetch Data
+    stored_day = {}
     if date:
         target_date = datetime.strptime(date, "%Y-%m-%d")
         # Use Archive for past dates, Forecast for today/future
         if target_date.date() < datetime.now().date():
-            forecast = await weather_client.get_historical_weather(target_date)
+            api_task = weather_client.get_historical_weather(target_date)
+        else:
+            api_task = weather_client.get_forecast()
+
+        if skip_analysis:
+            forecast = await api_task
         else:
-            forecast = await weather_client.get_forecast()
+            # The forecast only covers today, so rows already stored for the requested
+            # day are loaded from the DB while the API request is in flight
+            forecast, stored_day = await asyncio.gather(
+                api_task,
+                run_in_threadpool(_load_weather_day, db, target_date)
+            )
     else:
         forecast = await weather_client.get_forecast()
     
@@ -42,55 +157,44 @@ async def get_weather_insights(date: Optional[str] = None, skip_analysis: bool =
     winds = hourly.get("wind_speed_10m", [])
     solars = hourly.get("direct_radiation", [])
     
-    saved_data = []
-    
-    for i, t_str in enumerate(times):
-        # OpenMeteo returns ISO string "2023-11-30T14:00"
-        ts = datetime.fromisoformat(t_str)
-        
-        exists = db.query(WeatherData).filter(WeatherData.timestamp == ts).first()
-        if not exists:
-            wd = WeatherData(
-                timestamp=ts,
-                temperature=temps[i],
-                wind_speed=winds[i],
-                solar_radiation=solars[i],
-                zone="DE"
+    # OpenMeteo returns ISO strings like "2023-11-30T14:00"; parse them in one vectorized call
+    timestamps = pd.to_datetime(times).to_pydatetime() if times else []
+    rows = [
+        {
+            "timestamp": ts,
+            "temperature": temp,
+            "wind_speed": wind,
+            "solar_radiation": solar,
+            "zone": "DE"
+        }
+        for ts, temp, wind, solar in zip(timestamps, temps, winds, solars)
+    ]
+    saved_data = [
+        _weather_point(ts, temp, wind, solar)
+        for ts, temp, wind, solar in zip(timestamps, temps, winds, solars)
+    ]
+
+    if rows:
+        _async_commit(db)
+        db.execute(
+            pg_insert(WeatherData).values(rows).on_conflict_do_nothing(
+                index_elements=["timestamp", "zone"]
             )
-            db.add(wd)
-            saved_data.append({
-                "timestamp": t_str,
-                "temp": temps[i],
-                "wind": winds[i],
-                "solar": solars[i]
-            })
-            
+        )
     db.commit()
     
     if skip_analysis:
         return {"status": "data_fetched", "count": len(saved_data)}
     
-    # 3. Analyze
+    # 3. Analyze (freshly fetched rows are already in memory)
     if date:
-        # Fetch specific date from DB
-        target_date = datetime.strptime(date, "%Y-%m-%d")
-        start_dt = target_date
-        end_dt = target_date + timedelta(days=1)
-        db_data = db.query(WeatherData).filter(
-            WeatherData.timestamp >= start_dt, 
-            WeatherData.timestamp < end_dt
-        ).all()
-    else:
-        # Fetch last 24h from DB
-        past_24h = datetime.now() - timedelta(hours=24)
-        db_data = db.query(WeatherData).filter(WeatherData.timestamp >= past_24h).all()
-
-    saved_data = [{
-        "timestamp": d.timestamp.isoformat(),
-        "temp": float(d.temperature),
-        "wind": float(d.wind_speed),
-        "solar": float(d.solar_radiation)
-    } for d in db_data]
+        day_data = {
+            row["timestamp"]: d for row, d in zip(rows, saved_data)
+            if row["timestamp"].date() == target_date.date()
+        }
+        for ts, d in stored_day.items():
+            day_data.setdefault(ts, d)
+        saved_data = [day_data[ts] for ts in sorted(day_data)]
 
     analysis_input = {
         "source": "OpenMeteo (Weather)",
@@ -107,98 +211,109 @@ async def root():
 async def health_check():
     return {"status": "ok"}
 
+async def _prepare_smard_analysis(date: Optional[str], background_tasks: BackgroundTasks) -> dict:
+    """
+    Fetch SMARD prices (latest or for 'date'), schedule saving them to the DB
+    and return the agent input.
+    """
+    # 1. Fetch Data
+    if date:
+        target_date = datetime.strptime(date, "%Y-%m-%d")
+        market_data = await smard_client.get_historical_prices(target_date)
+    else:
+        market_data = await smard_client.get_wholesale_prices()
+    
+    # 2. Filter Data for Agent and Save to Database (after the response)
+    valid_data = []
+    rows = []
+    if "data" in market_data:
+        # Skip if price is None
+        valid_data = [item for item in market_data["data"] if item.get("price") is not None]
+
+        # Convert timestamp (ms) to datetime
+        rows = [
+            {
+                "timestamp": datetime.fromtimestamp(item["timestamp"] / 1000.0, tz=timezone.utc),
+                "price": item["price"],
+                "currency": "EUR",
+                "zone": "DE-LU"
+            }
+            for item in valid_data
+        ]
+
+        background_tasks.add_task(_persist_prices, rows)
+
+    # 3. Format for AI (the day / last 24h is already in memory)
+    analysis_data = {
+        "source": "database",
+        "data": [
+            {
+                "timestamp": row["timestamp"].isoformat(),
+                "price": float(row["price"])
+            }
+            for row in rows
+        ]
+    }
+    if "error" in market_data:
+        analysis_data["error"] = market_data["error"]
+    return analysis_data
+
 @app.get("/insights/smard", response_model=TradingInsight)
-async def get_smard_insights(date: Optional[str] = None, db: Session = Depends(get_db)):
+async def get_smard_insights(background_tasks: BackgroundTasks, date: Optional[str] = None):
     """
     Fetch data from SMARD, save to DB, and generate trading insights.
     Optionally provide a 'date' (YYYY-MM-DD) to fetch historical data for that day.
     """
-    try:
-        # 1. Fetch Data
-        if date:
-            target_date = datetime.strptime(date, "%Y-%m-%d")
-            market_data = await smard_client.get_historical_prices(target_date)
-        else:
-            market_data = await smard_client.get_wholesale_prices()
-        
-        # 2. Save to Database and Filter Data for Agent
-        valid_data = []
-        if "data" in market_data:
-            for item in market_data["data"]:
-                # Skip if price is None
-                if item.get("price") is None:
-                    continue
-
-                valid_data.append(item)
+    key = _memo_key("smard", date)
+    cached = _insight_memo.get(key)
+    if cached is not None:
+        return cached
 
-                # Convert timestamp (ms) to datetime
-                ts = datetime.fromtimestamp(item["timestamp"] / 1000.0)
-                
-                # Check if exists
-                exists = db.query(DayAheadPrice).filter(
-                    DayAheadPrice.timestamp == ts,
-                    DayAheadPrice.zone == "DE-LU"
-                ).first()
-                
-                if not exists:
-                    db_price = DayAheadPrice(
-                        timestamp=ts,
-                        price=item["price"],
-                        currency="EUR",
-                        zone="DE-LU"
-                    )
-                    db.add(db_price)
-            db.commit()
-
-        # 3. Fetch data for Analysis (Last 24h OR Specific Date)
-        if date:
-            # If historical, analyze that specific day
-            target_date = datetime.strptime(date, "%Y-%m-%d")
-            start_dt = target_date
-            end_dt = target_date + timedelta(days=1)
-            
-            db_prices = db.query(DayAheadPrice).filter(
-                DayAheadPrice.timestamp >= start_dt,
-                DayAheadPrice.timestamp < end_dt,
-                DayAheadPrice.zone == "DE-LU"
-            ).order_by(DayAheadPrice.timestamp.asc()).all()
-        else:
-            # Default: Last 24h
-            past_24h = datetime.now() - timedelta(hours=24)
-            db_prices = db.query(DayAheadPrice).filter(
-                DayAheadPrice.timestamp >= past_24h,
-                DayAheadPrice.zone == "DE-LU"
-            ).order_by(DayAheadPrice.timestamp.asc()).all()
-
-        # Format for AI
-        analysis_data = {
-            "source": "database",
-            "data": [
-                {
-                    "timestamp": p.timestamp.isoformat(),
-                    "price": float(p.price)
-                }
-                for p in db_prices
-            ]
-        }
+    try:
+        analysis_data = await _prepare_smard_analysis(date, background_tasks)
 
         # 4. Analyze with Agent
         insight = await agent.analyze(analysis_data)
         
+        _memoize_insight(key, analysis_data, insight)
         return insight
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/insights/smard/stream")
+async def stream_smard_insights(background_tasks: BackgroundTasks, date: Optional[str] = None):
+    """
+    Same as /insights/smard, but streams the insight JSON as Server-Sent Events
+    while the model generates it. Each event's data is a JSON-encoded text chunk;
+    concatenating them yields the insight object.
+    """
+    try:
+        analysis_data = await _prepare_smard_analysis(date, background_tasks)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events():
+        async for chunk in agent.analyze_stream(analysis_data):
+            yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.get("/insights/elexon", response_model=TradingInsight)
-async def get_elexon_insights(db: Session = Depends(get_db)):
+async def get_elexon_insights(background_tasks: BackgroundTasks):
     """
-    Fetch data from Elexon, save to DB, and generate trading insights.
+    Fetch data from Elexon, save to DB (after the response), and generate trading insights.
     """
+    key = _memo_key("elexon")
+    cached = _insight_memo.get(key)
+    if cached is not None:
+        return cached
+
     try:
         market_data = await elexon_client.get_system_prices()
         
         # Save to Database
         if "data" in market_data:
+            rows = []
             for item in market_data["data"]:
                 # item has settlement_date (YYYY-MM-DD) and settlement_period (1-48)
                 date_str = item["settlement_date"]
@@ -210,25 +325,17 @@ async def get_elexon_insights(db: Session = Depends(get_db)):
                 ts = base_date + timedelta(minutes=(period - 1) * 30)
                 
                 # Use System Buy Price (sbp) as the reference price
-                price = item.get("sbp", 0)
-                
-                # Check if exists
-                exists = db.query(DayAheadPrice).filter(
-                    DayAheadPrice.timestamp == ts,
-                    DayAheadPrice.zone == "GB"
-                ).first()
-                
-                if not exists:
-                    db_price = DayAheadPrice(
-                        timestamp=ts,
-                        price=price,
-                        currency="GBP",
-                        zone="GB"
-                    )
-                    db.add(db_price)
-            db.commit()
+                rows.append({
+                    "timestamp": ts,
+                    "price": item.get("sbp", 0),
+                    "currency": "GBP",
+                    "zone": "GB"
+                })
+
+            background_tasks.add_task(_persist_prices, rows)
 
         insight = await agent.analyze(market_data)
+        _memoize_insight(key, market_data, insight)
         return insight
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -244,18 +351,21 @@ async def get_news_insights(db: Session = Depends(get_db)):
         
         # 2. Save to Database
         saved_count = 0
-        for item in news_items:
-            # Check if exists
-            exists = db.query(EnergyNews).filter(EnergyNews.url == item["url"]).first()
-            if not exists:
-                db_news = EnergyNews(
-                    title=item["title"],
-                    summary=item["summary"],
-                    published=item["published"],
-                    url=item["url"]
-                )
-                db.add(db_news)
-                saved_count += 1
+        rows = [
+            {
+                "title": item.title,
+                "summary": item.summary,
+                "published": item.published,
+                "url": item.url
+            }
+            for item in news_items
+        ]
+        if rows:
+            _async_commit(db)
+            result = db.execute(
+                pg_insert(EnergyNews).values(rows).on_conflict_do_nothing(index_elements=["url"])
+            )
+            saved_count = result.rowcount
         db.commit()
         
         # 3. Analyze with Agent
@@ -263,7 +373,7 @@ async def get_news_insights(db: Session = Depends(get_db)):
             "type": "news",
             "count": len(news_items),
             "new_items": saved_count,
-            "headlines": [item["title"] for item in news_items[:10]]
+            "headlines": [item.title for item in news_items[:10]]
         }
         
         insight = await agent.analyze(market_data)
@@ -271,3 +381,54 @@ async def get_news_insights(db: Session = Depends(get_db)):
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+class InsightSubRequest(BaseModel):
+    source: Literal["smard", "elexon", "news", "weather"]
+    date: Optional[str] = None
+    skip_analysis: Optional[bool] = None
+
+class BatchInsightRequest(BaseModel):
+    requests: List[InsightSubRequest]
+
+INSIGHT_HANDLERS = {
+    "smard": get_smard_insights,
+    "elexon": get_elexon_insights,
+    "news": get_news_insights,
+    "weather": get_weather_insights,
+}
+
+async def _run_insight_request(sub: InsightSubRequest, background_tasks: BackgroundTasks):
+    handler = INSIGHT_HANDLERS[sub.source]
+    accepted = inspect.signature(handler).parameters
+    # Drop fields the handler doesn't take (e.g. 'date' for elexon), as the GET routes ignore them
+    params = {
+        k: v for k, v in sub.model_dump(exclude={"source"}, exclude_none=True).items()
+        if k in accepted
+    }
+    if "background_tasks" in accepted:
+        params["background_tasks"] = background_tasks
+    if "db" not in accepted:
+        return await handler(**params)
+
+    # Each sub-request gets its own session since they run concurrently
+    db = SessionLocal()
+    try:
+        return await handler(db=db, **params)
+    finally:
+        db.close()
+
+@app.post("/insights/batch")
+async def get_batch_insights(body: BatchInsightRequest, background_tasks: BackgroundTasks):
+    """
+    Run several insight requests concurrently and return their results in request order.
+    Failed sub-requests are returned as {"error": ...} instead of failing the whole batch.
+    """
+    results = await asyncio.gather(
+        *[_run_insight_request(sub, background_tasks) for sub in body.requests],
+        return_exceptions=True
+    )
+    return [
+        {"error": r.detail if isinstance(r, HTTPException) else str(r)}
+        if isinstance(r, Exception) else r
+        for r in results
+    ]
@@ -1,16 +1,20 @@
 import httpx
 from typing import Dict, Any, Optional
+from datetime import datetime, timezone
 import os
 
-class ElexonClient:
+from app.services.http import HTTPService
+
+class ElexonClient(HTTPService):
     """
     Client for Elexon BMRS API.
     Docs: https://www.elexon.co.uk/guidance-note/bmrs-api-data-push-user-guide/
     """
     BASE_URL = "https://api.bmreports.com/BMRS"
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key or os.getenv("ELEXON_API_KEY", "mock_key")
+        super().__init__(client)
 
     async def get_system_prices(self) -> Dict[str, Any]:
         """
@@ -25,7 +29,7 @@ class ElexonClient:
         
         try:
             # Fetch data for today
-            today = datetime.utcnow().strftime("%Y-%m-%d")
+            today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
             url = f"{self.BASE_URL}/DERSYSDATA/v1"
             params = {
                 "APIKey": self.api_key,
@@ -33,10 +37,9 @@ class ElexonClient:
                 "SettlementDate": today
             }
             
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(url, params=params)
-                resp.raise_for_status()
-                data = resp.json()
+            resp = await self.client.get(url, params=params)
+            resp.raise_for_status()
+            data = resp.json()
             
             # Process the response
             # Structure: response -> responseBody -> responseList -> item (list)
@@ -54,7 +57,7 @@ class ElexonClient:
             return {
                 "data": formatted_data[-48:], # Last 48 periods (approx 24 hours)
                 "source": "Elexon (Real Data)",
-                "updated_at": datetime.utcnow().isoformat()
+                "updated_at": datetime.now(timezone.utc).isoformat()
             }
             
         except Exception as e:
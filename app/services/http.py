@@ -0,0 +1,59 @@
+import httpx
+from typing import Optional
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Build the pooled AsyncClient shared by the external data clients.
+    Keep-alive connections are reused across requests instead of paying a
+    new TCP/TLS handshake per call.
+    """
+    return httpx.AsyncClient(
+        # Bounded waits so a hung upstream cannot stall the worker
+        timeout=httpx.Timeout(5.0, connect=2.0),
+        limits=httpx.Limits(max_keepalive_connections=20)
+    )
+
+class HTTPService:
+    """
+    Base for the external data clients. Requests go through a shared
+    AsyncClient when one is attached; otherwise the service creates its own
+    pooled client on first use and closes it in aclose().
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self._client: Optional[httpx.AsyncClient] = client
+        self._owns_client = False
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = create_http_client()
+            self._owns_client = True
+        return self._client
+
+    def attach_client(self, client: httpx.AsyncClient):
+        """
+        Route requests through a client owned by the caller (e.g. the app's
+        shared client); the caller stays responsible for closing it.
+        """
+        self._client = client
+        self._owns_client = False
+
+    def detach_client(self):
+        """
+        Drop an attached client; the next request creates an owned one.
+        """
+        if not self._owns_client:
+            self._client = None
+
+    async def aclose(self):
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+        self._client = None
+        self._owns_client = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -1,14 +1,21 @@
+import bisect
 import httpx
+import numpy as np
 from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-class SmardClient:
+from app.services.http import HTTPService
+
+class SmardClient(HTTPService):
     """
     Client for the SMARD (Bundesnetzagentur) API.
     Docs: https://www.smard.de/en/download-center/download-market-data
     """
     BASE_URL = "https://www.smard.de/app/chart_data"
 
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        super().__init__(client)
+
     async def get_market_data(self, filter_id: int, region_id: str, resolution: str = "hour") -> Dict[str, Any]:
         """
         Fetch market data from SMARD.
@@ -44,10 +51,9 @@ class SmardClient:
         try:
             # 1. Get the index to find available timestamps
             index_url = f"{self.BASE_URL}/{filter_id}/{region}/index_{resolution}.json"
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(index_url)
-                resp.raise_for_status()
-                timestamps = resp.json().get("timestamps", [])
+            resp = await self.client.get(index_url)
+            resp.raise_for_status()
+            timestamps = resp.json().get("timestamps", [])
             
             if not timestamps:
                 return {"error": "No data available from SMARD"}
@@ -57,10 +63,9 @@ class SmardClient:
             
             # 3. Fetch the actual data
             data_url = f"{self.BASE_URL}/{filter_id}/{region}/{filter_id}_{region}_{resolution}_{latest_ts}.json"
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(data_url)
-                resp.raise_for_status()
-                data = resp.json()
+            resp = await self.client.get(data_url)
+            resp.raise_for_status()
+            data = resp.json()
             
             # 4. Process the data
             series = data.get("series", [])
@@ -77,7 +82,7 @@ class SmardClient:
                 "data": formatted_data[-24:],
                 "source": "SMARD (Real Data)",
                 "region": region,
-                "updated_at": datetime.utcnow().isoformat()
+                "updated_at": datetime.now(timezone.utc).isoformat()
             }
             
         except Exception as e:
@@ -94,10 +99,9 @@ class SmardClient:
         try:
             # 1. Get the index
             index_url = f"{self.BASE_URL}/{filter_id}/{region}/index_{resolution}.json"
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(index_url)
-                resp.raise_for_status()
-                timestamps = resp.json().get("timestamps", [])
+            resp = await self.client.get(index_url)
+            resp.raise_for_status()
+            timestamps = resp.json().get("timestamps", [])
             
             if not timestamps:
                 return {"error": "No data available"}
@@ -106,43 +110,34 @@ class SmardClient:
             # SMARD timestamps in index are the start of the file's data range.
             # We need to find the timestamp <= target_date_ts
             target_ts = int(target_date.timestamp() * 1000)
-            selected_ts = None
-            
-            # Timestamps are sorted. We want the largest timestamp that is <= target_ts
-            for ts in timestamps:
-                if ts <= target_ts:
-                    selected_ts = ts
-                else:
-                    break
-            
-            if not selected_ts:
-                selected_ts = timestamps[0] # Fallback to oldest
+            timestamps.sort()
+            idx = bisect.bisect_right(timestamps, target_ts) - 1
+            # Fallback to oldest if the target predates all files
+            selected_ts = timestamps[idx] if idx >= 0 else timestamps[0]
 
             # 3. Fetch data
             data_url = f"{self.BASE_URL}/{filter_id}/{region}/{filter_id}_{region}_{resolution}_{selected_ts}.json"
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(data_url)
-                resp.raise_for_status()
-                data = resp.json()
+            resp = await self.client.get(data_url)
+            resp.raise_for_status()
+            data = resp.json()
 
             # 4. Filter for the specific date
-            series = data.get("series", [])
-            formatted_data = []
-            
             # Define start/end of the target day
             day_start = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
             day_end = day_start + timedelta(days=1)
             ts_start = int(day_start.timestamp() * 1000)
             ts_end = int(day_end.timestamp() * 1000)
 
-            for point in series:
-                ts = point[0]
-                val = point[1]
-                if ts_start <= ts < ts_end:
-                    formatted_data.append({
-                        "timestamp": ts,
-                        "price": val
-                    })
+            # series is [[timestamp, value], ...]; missing values become NaN
+            series = np.asarray(data.get("series", []), dtype=np.float64).reshape(-1, 2)
+            mask = (series[:, 0] >= ts_start) & (series[:, 0] < ts_end)
+            formatted_data = [
+                {
+                    "timestamp": int(ts),
+                    "price": None if np.isnan(val) else float(val)
+                }
+                for ts, val in series[mask]
+            ]
             
             return {
                 "data": formatted_data,
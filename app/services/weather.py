@@ -1,8 +1,10 @@
 import httpx
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-class WeatherClient:
+from app.services.http import HTTPService
+
+class WeatherClient(HTTPService):
     BASE_URL = "https://api.open-meteo.com/v1/forecast"
     ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
     
@@ -10,6 +12,9 @@ class WeatherClient:
     LAT = 51.1657
     LON = 10.4515
 
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        super().__init__(client)
+
     async def get_forecast(self) -> Dict[str, Any]:
         """
         Fetch hourly weather forecast for Germany.
@@ -22,10 +27,9 @@ class WeatherClient:
             "forecast_days": 1
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.BASE_URL, params=params)
-            response.raise_for_status()
-            return response.json()
+        response = await self.client.get(self.BASE_URL, params=params)
+        response.raise_for_status()
+        return response.json()
 
     async def get_historical_weather(self, date: datetime) -> Dict[str, Any]:
         """
@@ -41,7 +45,6 @@ class WeatherClient:
             "timezone": "Europe/Berlin"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.ARCHIVE_URL, params=params)
-            response.raise_for_status()
-            return response.json()
+        response = await self.client.get(self.ARCHIVE_URL, params=params)
+        response.raise_for_status()
+        return response.json()
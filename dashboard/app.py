@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import requests
 import plotly.express as px
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from datetime import datetime, timedelta
 import os
 import time
@@ -29,36 +29,47 @@ if not DATABASE_URL:
 
 @st.cache_resource
 def init_connection():
-    return create_engine(DATABASE_URL)
+    return create_engine(DATABASE_URL, pool_size=10, max_overflow=20, pool_pre_ping=True)
 
+@st.cache_data(ttl=30, show_spinner=False)
 def load_prices(start_dt, end_dt):
     engine = init_connection()
-    query = f"""
+    query = text("""
     SELECT timestamp, price, zone 
     FROM dayahead_prices 
-    WHERE timestamp BETWEEN '{start_dt}' AND '{end_dt}'
+    WHERE timestamp BETWEEN :start AND :end
     ORDER BY timestamp ASC
-    """
-    return pd.read_sql(query, engine)
+    """)
+    return pd.read_sql(query, engine, params={"start": start_dt, "end": end_dt})
 
+@st.cache_data(ttl=30, show_spinner=False)
 def load_news():
     engine = init_connection()
     query = "SELECT published, title, summary, url FROM energy_news ORDER BY published DESC LIMIT 20"
     return pd.read_sql(query, engine)
 
+@st.cache_data(ttl=30, show_spinner=False)
 def load_weather(start_dt, end_dt):
     engine = init_connection()
-    query = f"""
+    query = text("""
     SELECT timestamp, temperature, wind_speed, solar_radiation 
     FROM weather_data 
-    WHERE timestamp BETWEEN '{start_dt}' AND '{end_dt}'
+    WHERE timestamp BETWEEN :start AND :end
     ORDER BY timestamp ASC
-    """
-    return pd.read_sql(query, engine)
+    """)
+    return pd.read_sql(query, engine, params={"start": start_dt, "end": end_dt})
+
+def clear_data_cache():
+    load_prices.clear()
+    load_news.clear()
+    load_weather.clear()
 
 # --- Sidebar Filters ---
 st.sidebar.title("🔍 Filters")
 
+if st.sidebar.button("🔄 Invalidate cache"):
+    clear_data_cache()
+
 # "Current" button logic
 if "view_mode" not in st.session_state:
     st.session_state.view_mode = "Live"
@@ -68,7 +79,8 @@ if st.sidebar.button("⚡ Show Live / Current", type="primary"):
 
 if st.session_state.view_mode == "Live":
     # Live View: Last 24h + Next 48h (Day Ahead)
-    now = datetime.now()
+    # Truncated to the minute so reruns reuse the cached query results
+    now = datetime.now().replace(second=0, microsecond=0)
     start_date = now - timedelta(hours=24)
     end_date = now + timedelta(hours=48)
     st.sidebar.info("Showing: Last 24h & Next 48h (Day-Ahead)")
@@ -131,32 +143,39 @@ with col2:
                 if st.session_state.view_mode == "Custom":
                     params["date"] = start_date.strftime("%Y-%m-%d")
 
-                # --- Background Fetch: Weather ---
-                try:
-                    w_params = params.copy()
-                    w_params["skip_analysis"] = "true"
-                    requests.get(f"{AGENT_URL}/insights/weather", params=w_params, timeout=5)
-                except Exception as e:
-                    print(f"Weather fetch warning: {e}")
-
                 # --- Main Analysis ---
                 if "Price" in analysis_type:
-                    endpoint = "/insights/smard"
+                    source = "smard"
                 elif "News" in analysis_type:
-                    endpoint = "/insights/news"
+                    source = "news"
                 else:
-                    endpoint = "/insights/weather"
-                
-                response = requests.get(f"{AGENT_URL}{endpoint}", params=params)
+                    source = "weather"
+
+                # Weather refresh and main analysis run concurrently in one request
+                batch = {
+                    "requests": [
+                        {"source": "weather", "skip_analysis": True, **params},
+                        {"source": source, **params}
+                    ]
+                }
+                response = requests.post(f"{AGENT_URL}/insights/batch", json=batch)
                 
                 if response.status_code == 200:
-                    # Save to Session State
-                    st.session_state['last_insight'] = response.json()
-                    st.session_state['last_insight_time'] = datetime.now().strftime("%H:%M:%S")
-                    
-                    # Force update to show new chart data
-                    time.sleep(1)
-                    st.rerun()
+                    weather_result, insight = response.json()
+                    if "error" in weather_result:
+                        print(f"Weather fetch warning: {weather_result['error']}")
+
+                    if "error" in insight:
+                        st.error(f"Agent Error: {insight['error']}")
+                    else:
+                        # Save to Session State
+                        st.session_state['last_insight'] = insight
+                        st.session_state['last_insight_time'] = datetime.now().strftime("%H:%M:%S")
+                        
+                        # Force update to show new chart data
+                        clear_data_cache()
+                        time.sleep(1)
+                        st.rerun()
                 else:
                     st.error(f"Agent Error: {response.text}")
             except Exception as e:
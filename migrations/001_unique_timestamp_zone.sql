@@ -0,0 +1,27 @@
+-- Composite uniqueness on (timestamp, zone) so ingestion can use
+-- INSERT ... ON CONFLICT (timestamp, zone) DO NOTHING.
+-- Apply once to databases created before this change:
+--   psql "$DATABASE_URL" -f migrations/001_unique_timestamp_zone.sql
+
+-- dayahead_prices: replace the timestamp-only unique constraint (created by
+-- SQLAlchemy's create_all) with (timestamp, zone), so DE-LU and GB rows can share an hour.
+ALTER TABLE dayahead_prices DROP CONSTRAINT IF EXISTS dayahead_prices_timestamp_key;
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'dayahead_prices_timestamp_zone_key'
+    ) THEN
+        ALTER TABLE dayahead_prices ADD CONSTRAINT dayahead_prices_timestamp_zone_key UNIQUE (timestamp, zone);
+    END IF;
+END $$;
+
+-- weather_data
+ALTER TABLE weather_data DROP CONSTRAINT IF EXISTS weather_data_timestamp_key;
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'weather_data_timestamp_zone_key'
+    ) THEN
+        ALTER TABLE weather_data ADD CONSTRAINT weather_data_timestamp_zone_key UNIQUE (timestamp, zone);
+    END IF;
+END $$;
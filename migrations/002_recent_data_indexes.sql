@@ -0,0 +1,8 @@
+-- Btree indexes backing the insight queries, which fetch the most recent
+-- prices per zone and the latest news by publication time.
+-- Apply once to databases created before this change:
+--   psql "$DATABASE_URL" -f migrations/002_recent_data_indexes.sql
+
+CREATE INDEX IF NOT EXISTS ix_prices_zone_ts ON dayahead_prices (zone, timestamp DESC);
+
+CREATE INDEX IF NOT EXISTS ix_energy_news_published ON energy_news (published DESC);
@@ -0,0 +1,12 @@
+-- Store prices and weather measurements as DOUBLE PRECISION instead of
+-- NUMERIC: hardware float arithmetic for aggregates and a smaller column.
+-- Apply once to databases created before this change:
+--   psql "$DATABASE_URL" -f migrations/003_float_measurements.sql
+
+ALTER TABLE dayahead_prices
+    ALTER COLUMN price TYPE DOUBLE PRECISION USING price::double precision;
+
+ALTER TABLE weather_data
+    ALTER COLUMN temperature TYPE DOUBLE PRECISION USING temperature::double precision,
+    ALTER COLUMN wind_speed TYPE DOUBLE PRECISION USING wind_speed::double precision,
+    ALTER COLUMN solar_radiation TYPE DOUBLE PRECISION USING solar_radiation::double precision;
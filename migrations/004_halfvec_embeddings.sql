@@ -0,0 +1,14 @@
+-- Store news embeddings as FP16 halfvec (pgvector >= 0.7) instead of FP32
+-- vector: half the storage and memory bandwidth per distance computation.
+-- Apply once to databases created before this change:
+--   psql "$DATABASE_URL" -f migrations/004_halfvec_embeddings.sql
+
+ALTER EXTENSION vector UPDATE;
+
+DROP INDEX IF EXISTS energy_news_embedding_idx;
+
+ALTER TABLE energy_news
+    ALTER COLUMN embedding TYPE halfvec(1536) USING embedding::halfvec(1536);
+
+CREATE INDEX IF NOT EXISTS ix_news_embedding_hnsw ON energy_news
+    USING hnsw (embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
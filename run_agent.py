@@ -1,6 +1,6 @@
 import asyncio
 import argparse
-import json
+import orjson
 from app.services.smard import SmardClient
 from app.services.elexon import ElexonClient
 from app.agent import EnergyAgent
@@ -17,13 +17,13 @@ async def main():
     
     try:
         if args.source == "smard":
-            client = SmardClient()
             print("📊 Fetching data from SMARD...")
-            market_data = await client.get_wholesale_prices()
+            async with SmardClient() as client:
+                market_data = await client.get_wholesale_prices()
         elif args.source == "elexon":
-            client = ElexonClient()
             print("📊 Fetching data from Elexon...")
-            market_data = await client.get_system_prices()
+            async with ElexonClient() as client:
+                market_data = await client.get_system_prices()
         
         print("fw Analyzing data with AI Agent...")
         insight = await agent.analyze(market_data)
@@ -41,8 +41,8 @@ async def main():
         print("="*50 + "\n")
 
         if args.output:
-            with open(args.output, "w") as f:
-                f.write(insight.model_dump_json(indent=2))
+            with open(args.output, "wb") as f:
+                f.write(orjson.dumps(insight.model_dump(mode="json"), option=orjson.OPT_INDENT_2))
             print(f"✅ Insight saved to {args.output}")
 
     except Exception as e:
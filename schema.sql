@@ -5,12 +5,15 @@ CREATE EXTENSION IF NOT EXISTS vector;
 CREATE TABLE IF NOT EXISTS dayahead_prices (
     id SERIAL PRIMARY KEY,
     timestamp TIMESTAMPTZ NOT NULL,
-    price NUMERIC NOT NULL,
+    price DOUBLE PRECISION NOT NULL,
     currency TEXT DEFAULT 'EUR',
     zone TEXT DEFAULT 'DE-LU',
     UNIQUE(timestamp, zone)
 );
 
+-- Per-zone range scans ordered by time
+CREATE INDEX IF NOT EXISTS ix_prices_zone_ts ON dayahead_prices (zone, timestamp DESC);
+
 -- Energy news table with vector embeddings
 CREATE TABLE IF NOT EXISTS energy_news (
     id SERIAL PRIMARY KEY,
@@ -18,9 +21,23 @@ CREATE TABLE IF NOT EXISTS energy_news (
     summary TEXT,
     published TIMESTAMPTZ,
     url TEXT UNIQUE,
-    embedding VECTOR(1536)
+    embedding HALFVEC(1536)
 );
 
+-- Recent-news lookups (published >= since ORDER BY published DESC LIMIT n)
+CREATE INDEX IF NOT EXISTS ix_energy_news_published ON energy_news (published DESC);
+
 -- Index for faster vector similarity search (IVFFlat or HNSW)
--- Using HNSW for better performance/recall trade-off
-CREATE INDEX IF NOT EXISTS energy_news_embedding_idx ON energy_news USING hnsw (embedding vector_cosine_ops);
+-- Using HNSW for better performance/recall trade-off; embeddings are FP16 (halfvec, pgvector >= 0.7)
+CREATE INDEX IF NOT EXISTS ix_news_embedding_hnsw ON energy_news USING hnsw (embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+-- Hourly weather observations/forecasts
+CREATE TABLE IF NOT EXISTS weather_data (
+    id SERIAL PRIMARY KEY,
+    timestamp TIMESTAMPTZ NOT NULL,
+    temperature DOUBLE PRECISION,
+    wind_speed DOUBLE PRECISION,
+    solar_radiation DOUBLE PRECISION,
+    zone TEXT DEFAULT 'DE',
+    UNIQUE(timestamp, zone)
+);
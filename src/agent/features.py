@@ -0,0 +1,37 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+def rolling_stats(x: np.ndarray, w: int) -> np.ndarray:
+    """
+    Trailing-window statistics over a price series.
+
+    Returns an (n, 4) array of rolling mean, std, min and max, where row i
+    covers x[max(0, i - w + 1):i + 1]. Windows at the start of the series are
+    shorter than w. Everything is computed with cumulative sums and strided
+    window views, so there is no Python-level loop over the points.
+    """
+    if w < 1:
+        raise ValueError(f"Window size must be at least 1, got {w}")
+    x = np.asarray(x, dtype=np.float64)
+    n = x.size
+    out = np.empty((n, 4))
+    if n == 0:
+        return out
+
+    # Mean and (population) std from running sums of x and x²
+    c1 = np.concatenate(([0.0], np.cumsum(x)))
+    c2 = np.concatenate(([0.0], np.cumsum(x * x)))
+    hi = np.arange(1, n + 1)
+    lo = np.maximum(hi - w, 0)
+    count = hi - lo
+    mean = (c1[hi] - c1[lo]) / count
+    var = (c2[hi] - c2[lo]) / count - mean * mean
+    out[:, 0] = mean
+    out[:, 1] = np.sqrt(np.maximum(var, 0.0))
+
+    # Min/max over w-wide views; NaN padding makes the leading windows partial
+    padded = np.concatenate((np.full(w - 1, np.nan), x))
+    windows = sliding_window_view(padded, w)
+    out[:, 2] = np.nanmin(windows, axis=1)
+    out[:, 3] = np.nanmax(windows, axis=1)
+    return out
@@ -1,43 +1,113 @@
 import os
-import json
+import orjson
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from functools import cache
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func, select
+from cachetools import TTLCache
+import numpy as np
+import pandas as pd
 
 from openai import OpenAI
 
 from src.db.models import DayAheadPrice, EnergyNews
+from src.agent.features import rolling_stats
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# The prompt describes DE-LU prices; other zones (e.g. GB from Elexon) share the table
+PRICE_ZONE = "DE-LU"
+
+# Above this many price points the prompt carries hourly means instead of raw points
+MAX_PROMPT_PRICES = 48
+
+def _prices_csv(prices: List[Dict]) -> str:
+    """
+    Serializes price points as compact "time,price" CSV for the LLM prompt,
+    aggregating to hourly means when there are more than MAX_PROMPT_PRICES points.
+    """
+    if len(prices) > MAX_PROMPT_PRICES:
+        series = pd.Series(
+            [p["price"] for p in prices],
+            index=pd.to_datetime([p["time"] for p in prices], utc=True)
+        ).resample("1h").mean().dropna()
+        rows = [(ts.isoformat(), price) for ts, price in series.items()]
+    else:
+        rows = [(p["time"], p["price"]) for p in prices]
+    return "time,price\n" + "\n".join(f"{ts},{price:.2f}" for ts, price in rows)
+
+# Trailing window (in price points) for the rolling features in the prompt
+FEATURE_WINDOW = 6
+
+def _price_features(prices: List[Dict]) -> str:
+    """
+    Summarizes the latest rolling mean/std/min/max of the price series for the LLM prompt.
+    """
+    if not prices:
+        return "n/a"
+    # Only the last window is reported, so only its points are converted
+    recent = prices[-FEATURE_WINDOW:]
+    arr = np.fromiter((p["price"] for p in recent), dtype=np.float64, count=len(recent))
+    mean, std, low, high = rolling_stats(arr, FEATURE_WINDOW)[-1]
+    return (
+        f"last {FEATURE_WINDOW} points: mean={mean:.2f}, std={std:.2f}, "
+        f"min={low:.2f}, max={high:.2f}"
+    )
+
+def _news_lines(news: List[Dict]) -> str:
+    """
+    Serializes news items as one "- date: title" line each for the LLM prompt.
+    """
+    return "\n".join(f"- {n['date']}: {n['title']}" for n in news)
+
+@cache
+def _get_openai_client() -> OpenAI:
+    """
+    Returns the process-wide OpenAI client; its HTTP connection pool is reused by every agent.
+    """
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+# Returned instead of calling the LLM when there is nothing to analyze
+INSUFFICIENT_DATA_INSIGHT = {
+    "error": "Insufficient data",
+    "market_summary": [],
+    "risks": [],
+    "opportunities": [],
+    "news_sentiment": "neutral",
+    "recommendation": "Hold (Insufficient Data)"
+}
+
 class TradingAgent:
     def __init__(self, model: str = "gpt-4o-mini"):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = _get_openai_client()
         self.model = os.getenv("LLM_MODEL", model)
 
     def get_recent_data(self, db: Session, hours: int = 24) -> Dict:
         """
         Fetches recent prices and news from the database.
         """
-        since = datetime.utcnow() - timedelta(hours=hours)
+        since = datetime.now(timezone.utc) - timedelta(hours=hours)
         
-        # Fetch prices
-        prices = db.query(DayAheadPrice).filter(
-            DayAheadPrice.timestamp >= since
-        ).order_by(DayAheadPrice.timestamp.asc()).all()
+        # Fetch prices (column projection; no ORM objects needed for read-only rows)
+        prices = db.execute(
+            select(DayAheadPrice.timestamp, DayAheadPrice.price, DayAheadPrice.currency)
+            .where(DayAheadPrice.zone == PRICE_ZONE, DayAheadPrice.timestamp >= since)
+            .order_by(DayAheadPrice.timestamp.asc())
+        ).all()
         
         # Fetch news
-        news = db.query(EnergyNews).filter(
-            EnergyNews.published >= since
-        ).order_by(EnergyNews.published.desc()).limit(10).all()
+        news = db.execute(
+            select(EnergyNews.title, EnergyNews.summary, EnergyNews.published)
+            .where(EnergyNews.published >= since)
+            .order_by(EnergyNews.published.desc())
+            .limit(10)
+        ).all()
         
         return {
             "prices": [
-                {"time": p.timestamp.isoformat(), "price": float(p.price), "currency": p.currency}
+                {"time": p.timestamp.isoformat(), "price": p.price, "currency": p.currency}
                 for p in prices
             ],
             "news": [
@@ -46,23 +116,10 @@ class TradingAgent:
             ]
         }
 
-    def generate_insights(self, db: Session) -> Dict:
+    def _build_messages(self, data: Dict) -> List[Dict]:
         """
-        Generates trading insights based on recent data.
+        Builds the chat messages for the insight request from recent data.
         """
-        data = self.get_recent_data(db)
-        
-        if not data["prices"] and not data["news"]:
-            logger.warning("No recent data found for insights generation.")
-            return {
-                "error": "Insufficient data",
-                "market_summary": [],
-                "risks": [],
-                "opportunities": [],
-                "news_sentiment": "neutral",
-                "recommendation": "Hold (Insufficient Data)"
-            }
-
         system_prompt = (
             "You are an AI assistant supporting a European energy trading desk.\n"
             "You receive electricity price data (DE-LU zone) and energy-related news.\n"
@@ -74,10 +131,13 @@ class TradingAgent:
         Analyze the following data and provide trading insights:
         
         Recent Day-Ahead Prices (DE-LU):
-        {json.dumps(data['prices'], indent=2)}
+        {_prices_csv(data['prices'])}
+        
+        Rolling Price Features:
+        {_price_features(data['prices'])}
         
         Recent Energy News:
-        {json.dumps(data['news'], indent=2)}
+        {_news_lines(data['news'])}
         
         Return a JSON object with the following structure:
         {{
@@ -89,27 +149,110 @@ class TradingAgent:
         }}
         """
 
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def generate_insights(self, db: Session) -> Dict:
+        """
+        Generates trading insights based on recent data.
+        """
+        data = self.get_recent_data(db)
+        
+        if not data["prices"] and not data["news"]:
+            logger.warning("No recent data found for insights generation.")
+            return dict(INSUFFICIENT_DATA_INSIGHT)
+
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=self._build_messages(data),
                 response_format={"type": "json_object"},
                 temperature=0.2
             )
             
             content = response.choices[0].message.content
-            return json.loads(content)
+            return orjson.loads(content)
             
         except Exception as e:
-            logger.error(f"Error generating insights: {e}")
+            logger.error("Error generating insights: %s", e)
             raise
 
+    def stream_insights(self, data: Dict) -> Iterator[str]:
+        """
+        Streams the insight JSON text for already-fetched data as the model generates it.
+        """
+        if not data["prices"] and not data["news"]:
+            logger.warning("No recent data found for insights generation.")
+            yield orjson.dumps(INSUFFICIENT_DATA_INSIGHT).decode()
+            return
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=self._build_messages(data),
+            response_format={"type": "json_object"},
+            temperature=0.2,
+            stream=True
+        )
+        for chunk in response:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+
+# Seconds an insight is reused while no new prices or news have landed
+INSIGHT_CACHE_TTL = 900
+
+# Insights keyed by (latest price timestamp, latest news id)
+_insight_cache = TTLCache(maxsize=16, ttl=INSIGHT_CACHE_TTL)
+
+def _insight_cache_key(db: Session):
+    return (
+        db.query(func.max(DayAheadPrice.timestamp)).filter(DayAheadPrice.zone == PRICE_ZONE).scalar(),
+        db.query(func.max(EnergyNews.id)).scalar()
+    )
+
 def run_agent_analysis(db: Session) -> Dict:
     """
     Convenience function to run the agent.
+    Reuses the previous insight while the underlying prices and news are unchanged.
     """
+    key = _insight_cache_key(db)
+    cached = _insight_cache.get(key)
+    if cached is not None:
+        return cached
+
     agent = TradingAgent()
-    return agent.generate_insights(db)
+    insights = agent.generate_insights(db)
+    # Don't pin the "Insufficient data" placeholder
+    if "error" not in insights:
+        _insight_cache[key] = insights
+    return insights
+
+def stream_agent_analysis(db: Session) -> Iterator[str]:
+    """
+    Streaming variant of run_agent_analysis: yields the insight JSON text in chunks.
+    All database reads happen before this returns, so the iterator can be consumed
+    after the session is closed. The completed insight is cached like run_agent_analysis.
+    """
+    key = _insight_cache_key(db)
+    cached = _insight_cache.get(key)
+    if cached is not None:
+        return iter([orjson.dumps(cached).decode()])
+
+    agent = TradingAgent()
+    data = agent.get_recent_data(db)
+
+    def chunks():
+        parts = []
+        for part in agent.stream_insights(data):
+            parts.append(part)
+            yield part
+        try:
+            insights = orjson.loads("".join(parts))
+        except orjson.JSONDecodeError:
+            logger.warning("Streamed insight was not valid JSON; not caching it")
+            return
+        if "error" not in insights:
+            _insight_cache[key] = insights
+
+    return chunks()
@@ -1,15 +1,25 @@
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import List, Optional
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
+import orjson
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, List, Optional
+from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from src.db.database import get_db, engine
 from src.db.models import Base, DayAheadPrice, EnergyNews
-from src.ingestion.entsoe import fetch_dayahead_prices
-from src.ingestion.gdelt import fetch_energy_news
-from src.agent.insights import run_agent_analysis
+from src.ingestion.http import get_client as get_http_client, close_client as close_http_client
+
+if TYPE_CHECKING:
+    from src.ingestion.entsoe import PricePoint
+    from src.ingestion.gdelt import NewsItem
+
+# Ingestion (pandas/lxml) and agent (openai) modules are imported inside the
+# endpoints that use them, so process start and /health don't pay for them.
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +30,15 @@ Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="Energy Trading Insight Agent API")
 
+@app.on_event("startup")
+async def startup():
+    # Open the shared ingestion client once so requests reuse its connections
+    get_http_client()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_http_client()
+
 # Pydantic models for API
 class InsightRequest(BaseModel):
     model: Optional[str] = "gpt-4o-mini"
@@ -31,91 +50,165 @@ class IngestionRequest(BaseModel):
 def health_check():
     return {"status": "ok"}
 
+def _store_prices(db: Session, prices_data: List["PricePoint"]) -> int:
+    rows = [
+        {
+            "timestamp": p_data.timestamp,
+            "price": p_data.price,
+            "currency": p_data.currency,
+            "zone": p_data.zone
+        }
+        for p_data in prices_data
+    ]
+
+    # Single statement; rows already stored for (timestamp, zone) are skipped
+    count = 0
+    if rows:
+        result = db.execute(
+            insert(DayAheadPrice).values(rows).on_conflict_do_nothing(
+                index_elements=["timestamp", "zone"]
+            )
+        )
+        count = result.rowcount
+
+    db.commit()
+    return count
+
+def _store_news(db: Session, news_data: List["NewsItem"]) -> int:
+    rows = [
+        {
+            "title": n_data.title,
+            "summary": n_data.summary,
+            "published": n_data.published,
+            "url": n_data.url
+            # Embedding generation would happen here or in a background task
+            # For now we skip embedding generation to keep it simple as per prompt requirements regarding "Use pgvector if installed"
+            # Ideally we would use an embedding model here.
+        }
+        for n_data in news_data
+    ]
+
+    # Single statement; articles whose URL is already stored are skipped
+    count = 0
+    if rows:
+        result = db.execute(
+            insert(EnergyNews).values(rows).on_conflict_do_nothing(index_elements=["url"])
+        )
+        count = result.rowcount
+
+    db.commit()
+    return count
+
+def _price_window(days: int):
+    # Hour-aligned so repeated calls hit the fetcher's window cache; ENTSO-E data is daily anyway
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    end_date = now + timedelta(days=1) # Get tomorrow's prices too if available
+    start_date = now - timedelta(days=days)
+    return start_date, end_date
+
 @app.post("/ingestion/entsoe")
-def trigger_entsoe_ingestion(request: IngestionRequest, db: Session = Depends(get_db)):
+async def trigger_entsoe_ingestion(request: IngestionRequest, db: Session = Depends(get_db)):
     """
     Triggers ingestion of ENTSO-E Day-Ahead Prices.
     """
+    from src.ingestion.entsoe import fetch_dayahead_prices
+
     try:
-        end_date = datetime.utcnow() + timedelta(days=1) # Get tomorrow's prices too if available
-        start_date = datetime.utcnow() - timedelta(days=request.days)
-        
-        prices_data = fetch_dayahead_prices(start_date, end_date)
-        
-        count = 0
-        for p_data in prices_data:
-            # Check if exists
-            exists = db.query(DayAheadPrice).filter(
-                DayAheadPrice.timestamp == p_data["timestamp"],
-                DayAheadPrice.zone == p_data["zone"]
-            ).first()
-            
-            if not exists:
-                db_price = DayAheadPrice(
-                    timestamp=p_data["timestamp"],
-                    price=p_data["price"],
-                    currency=p_data["currency"],
-                    zone=p_data["zone"]
-                )
-                db.add(db_price)
-                count += 1
-        
-        db.commit()
+        prices_data = await fetch_dayahead_prices(*_price_window(request.days))
+        # DB writes are blocking; keep them off the event loop
+        count = await run_in_threadpool(_store_prices, db, prices_data)
         return {"status": "success", "inserted_count": count}
         
     except Exception as e:
-        logger.error(f"ENTSO-E ingestion failed: {e}")
+        logger.error("ENTSO-E ingestion failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/ingestion/gdelt")
-def trigger_gdelt_ingestion(request: IngestionRequest, db: Session = Depends(get_db)):
+async def trigger_gdelt_ingestion(request: IngestionRequest, db: Session = Depends(get_db)):
     """
     Triggers ingestion of GDELT Energy News.
     """
+    from src.ingestion.gdelt import fetch_energy_news
+
     try:
-        news_data = fetch_energy_news(timespan=f"{request.days * 24}h")
-        
-        count = 0
-        for n_data in news_data:
-            # Check if exists by URL
-            if n_data.get("url"):
-                exists = db.query(EnergyNews).filter(EnergyNews.url == n_data["url"]).first()
-                if exists:
-                    continue
-            
-            db_news = EnergyNews(
-                title=n_data["title"],
-                summary=n_data["summary"],
-                published=n_data["published"],
-                url=n_data["url"]
-                # Embedding generation would happen here or in a background task
-                # For now we skip embedding generation to keep it simple as per prompt requirements regarding "Use pgvector if installed"
-                # Ideally we would use an embedding model here.
-            )
-            db.add(db_news)
-            count += 1
-            
-        db.commit()
+        news_data = await fetch_energy_news(timespan=f"{request.days * 24}h")
+        count = await run_in_threadpool(_store_news, db, news_data)
         return {"status": "success", "inserted_count": count}
         
     except Exception as e:
-        logger.error(f"GDELT ingestion failed: {e}")
+        logger.error("GDELT ingestion failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/ingestion/all")
+async def trigger_all_ingestion(request: IngestionRequest, db: Session = Depends(get_db)):
+    """
+    Triggers ENTSO-E and GDELT ingestion together; both upstream calls run concurrently.
+    """
+    from src.ingestion.entsoe import fetch_dayahead_prices
+    from src.ingestion.gdelt import fetch_energy_news
+
+    try:
+        prices_data, news_data = await asyncio.gather(
+            fetch_dayahead_prices(*_price_window(request.days)),
+            fetch_energy_news(timespan=f"{request.days * 24}h")
+        )
+        prices_count = await run_in_threadpool(_store_prices, db, prices_data)
+        news_count = await run_in_threadpool(_store_news, db, news_data)
+        return {
+            "status": "success",
+            "inserted_count": {"entsoe": prices_count, "gdelt": news_count}
+        }
+
+    except Exception as e:
+        logger.error("Combined ingestion failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/insights/run")
-def generate_insights(request: InsightRequest, db: Session = Depends(get_db)):
+def generate_insights(request: InsightRequest, response: Response, db: Session = Depends(get_db)):
     """
     Generates trading insights using the AI Agent.
     """
+    from src.agent.insights import run_agent_analysis, INSIGHT_CACHE_TTL
+
     try:
         # We could pass the model from request to the agent if we updated the agent signature
         # For now, it uses the env var or default
         insights = run_agent_analysis(db)
+        # Only results the server caches may be cached downstream; the
+        # "Insufficient data" placeholder is recomputed on every call
+        if "error" not in insights:
+            response.headers["Cache-Control"] = f"max-age={INSIGHT_CACHE_TTL}"
         return insights
     except Exception as e:
-        logger.error(f"Insight generation failed: {e}")
+        logger.error("Insight generation failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/insights/run/stream")
+def stream_insights(request: InsightRequest, db: Session = Depends(get_db)):
+    """
+    Same as /insights/run, but streams the insight JSON as Server-Sent Events
+    while the model generates it. Each event's data is a JSON-encoded text chunk;
+    concatenating them yields the insight object.
+    """
+    from src.agent.insights import stream_agent_analysis
+
+    try:
+        chunks = stream_agent_analysis(db)
+    except Exception as e:
+        logger.error("Insight generation failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def events():
+        try:
+            for chunk in chunks:
+                yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+        except Exception as e:
+            logger.error("Insight streaming failed: %s", e)
+            error = orjson.dumps({"error": str(e)}).decode()
+            yield f"data: {orjson.dumps(error).decode()}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.get("/prices/latest")
 def get_latest_prices(limit: int = 24, db: Session = Depends(get_db)):
     prices = db.query(DayAheadPrice).order_by(DayAheadPrice.timestamp.desc()).limit(limit).all()
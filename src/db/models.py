@@ -1,6 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
-from pgvector.sqlalchemy import Vector
+try:
+    from pgvector.sqlalchemy import HALFVEC
+except ImportError:  # pgvector is optional; news embeddings are skipped without it
+    HALFVEC = None
 
 Base = declarative_base()
 
@@ -8,11 +11,16 @@ class DayAheadPrice(Base):
     __tablename__ = 'dayahead_prices'
 
     id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime(timezone=True), nullable=False, unique=True)
-    price = Column(Numeric, nullable=False)
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+    price = Column(Float, nullable=False)
     currency = Column(String, default='EUR')
     zone = Column(String, default='DE-LU')
 
+    __table_args__ = (
+        UniqueConstraint('timestamp', 'zone'),
+        Index('ix_prices_zone_ts', zone, timestamp.desc()),
+    )
+
 class EnergyNews(Base):
     __tablename__ = 'energy_news'
 
@@ -21,14 +29,29 @@ class EnergyNews(Base):
     summary = Column(Text)
     url = Column(String, unique=True)
     published = Column(DateTime(timezone=True))
-    embedding = Column(Vector(1536))  # For OpenAI embeddings
+    __table_args__ = (
+        Index('ix_energy_news_published', published.desc()),
+    )
+
+    if HALFVEC is not None:
+        # For OpenAI embeddings, stored as FP16 (halfvec) to halve row and index size
+        embedding = Column(HALFVEC(1536))
+        __table_args__ += (
+            Index(
+                'ix_news_embedding_hnsw', embedding,
+                postgresql_using='hnsw',
+                postgresql_with={'m': 16, 'ef_construction': 64},
+                postgresql_ops={'embedding': 'halfvec_cosine_ops'}
+            ),
+        )
 
 class WeatherData(Base):
     __tablename__ = 'weather_data'
+    __table_args__ = (UniqueConstraint('timestamp', 'zone'),)
 
     id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime(timezone=True), nullable=False, unique=True)
-    temperature = Column(Numeric)  # Celsius
-    wind_speed = Column(Numeric)   # km/h
-    solar_radiation = Column(Numeric) # W/m²
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+    temperature = Column(Float)  # Celsius
+    wind_speed = Column(Float)   # km/h
+    solar_radiation = Column(Float) # W/m²
     zone = Column(String, default='DE')
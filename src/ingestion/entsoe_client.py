@@ -1,13 +1,14 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
-import xml.etree.ElementTree as ET
-from datetime import datetime, timedelta
+from datetime import datetime
 from io import StringIO
 import logging
 from typing import Optional
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from src.ingestion.entsoe_xml import iter_periods
+
 logger = logging.getLogger(__name__)
 
 ENTSOE_API_URL = "https://web-api.tp.entsoe.eu/api"
@@ -22,6 +23,16 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
+# One pooled session for all calls: sockets and TLS sessions are reused and
+# transient upstream errors are retried with backoff.
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+))
+
 def fetch_load_data(
     domain_code: str,
     start_date: datetime,
@@ -50,88 +61,34 @@ def fetch_load_data(
         "periodEnd": period_end
     }
     
-    logger.info(f"Fetching load data for {domain_code} from {period_start} to {period_end}")
+    logger.info("Fetching load data for %s from %s to %s", domain_code, period_start, period_end)
     
     try:
-        session = requests.Session()
-        session.headers.update(HEADERS)
-        response = session.get(ENTSOE_API_URL, params=params)
+        response = _SESSION.get(ENTSOE_API_URL, params=params)
         response.raise_for_status()
         
         return _parse_load_xml(response.content)
         
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching load data: {e}")
+        logger.error("Error fetching load data: %s", e)
         if 'response' in locals() and response is not None:
-             logger.error(f"Response content: {response.text[:500]}...") # Log first 500 chars
+             logger.error("Response content: %s...", response.text[:500]) # Log first 500 chars
         raise
 
 def _parse_load_xml(xml_content: bytes) -> pd.DataFrame:
     """
     Parses ENTSO-E XML response for Load Data.
+    Streams the document with iterparse so memory stays flat for large responses;
+    point timestamps are computed per Period in one vectorized step.
     """
-    # ENTSO-E XML uses namespaces. We need to handle them.
-    # The namespace URI might change versions, but usually follows a pattern.
-    # We'll try to extract it or handle it generically.
-    
-    try:
-        root = ET.fromstring(xml_content)
-    except ET.ParseError as e:
-        logger.error(f"Failed to parse XML: {e}")
-        raise
-
-    # Extract namespace from root tag
-    # e.g. {urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:0}Publication_MarketDocument
-    if '}' in root.tag:
-        ns_url = root.tag.split('}')[0].strip('{')
-        ns = {'ns': ns_url}
-    else:
-        ns = {}
+    # ENTSO-E XML uses namespaces and the namespace URI changes between versions,
+    # so tags are matched in any namespace (iter_periods' default).
+    frames = [
+        pd.DataFrame({'timestamp': timestamps, 'MW': quantities})
+        for _, timestamps, quantities in iter_periods(xml_content, "quantity")
+    ]
 
-    data = []
-    
-    # Find all TimeSeries
-    # If ns is present, use it.
-    time_series_list = root.findall('.//ns:TimeSeries', ns) if ns else root.findall('.//TimeSeries')
-    
-    for ts in time_series_list:
-        # Check if it's the right object aggregation (optional, but good for safety)
-        # For Load, we expect System Total Load
-        
-        period = ts.find('ns:Period', ns) if ns else ts.find('Period')
-        if period is None:
-            continue
-            
-        start_str = period.find('ns:timeInterval/ns:start', ns).text if ns else period.find('timeInterval/start').text
-        resolution = period.find('ns:resolution', ns).text if ns else period.find('resolution').text
-        
-        # Parse start time. ENTSO-E usually returns UTC ISO format like 2023-10-26T22:00Z
-        start_dt = datetime.fromisoformat(start_str.replace('Z', '+00:00'))
-        
-        points = period.findall('ns:Point', ns) if ns else period.findall('Point')
-        
-        for point in points:
-            position = int(point.find('ns:position', ns).text if ns else point.find('position').text)
-            quantity = float(point.find('ns:quantity', ns).text if ns else point.find('quantity').text)
-            
-            # Calculate timestamp
-            if resolution == 'PT60M':
-                point_time = start_dt + timedelta(hours=position - 1)
-            elif resolution == 'PT15M':
-                point_time = start_dt + timedelta(minutes=(position - 1) * 15)
-            elif resolution == 'PT30M':
-                point_time = start_dt + timedelta(minutes=(position - 1) * 30)
-            else:
-                # Fallback, assume 1 hour if unknown (risky but better than crash)
-                logger.warning(f"Unknown resolution {resolution}, assuming 1 hour")
-                point_time = start_dt + timedelta(hours=position - 1)
-                
-            data.append({
-                'timestamp': point_time,
-                'MW': quantity
-            })
-            
-    df = pd.DataFrame(data)
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
     if not df.empty:
         df = df.sort_values('timestamp').reset_index(drop=True)
         
@@ -165,12 +122,10 @@ def fetch_csv_data(
         domain_param_name: domain_code
     }
     
-    logger.info(f"Fetching CSV data: {params}")
+    logger.info("Fetching CSV data: %s", params)
     
     try:
-        session = requests.Session()
-        session.headers.update(HEADERS)
-        response = session.get(ENTSOE_FILE_SERVICE_URL, params=params)
+        response = _SESSION.get(ENTSOE_FILE_SERVICE_URL, params=params)
         response.raise_for_status()
         
         # The response is a CSV file content
@@ -182,7 +137,7 @@ def fetch_csv_data(
         return df
         
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching CSV data: {e}")
+        logger.error("Error fetching CSV data: %s", e)
         raise
 
 def merge_datasets(load_df: pd.DataFrame, price_df: pd.DataFrame) -> pd.DataFrame:
@@ -1,19 +1,32 @@
-import httpx
 from datetime import datetime
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, NamedTuple, Optional
 import logging
+from cachetools import TTLCache
+
+from src.ingestion.http import get_client
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 GDELT_API_URL = "https://api.gdeltproject.org/api/v2/doc/doc"
 
+# Parsed articles per (query, max_records, timespan); repeated ingestions
+# within the TTL skip the upstream call
+FETCH_CACHE_TTL = 300
+_fetch_cache = TTLCache(maxsize=64, ttl=FETCH_CACHE_TTL)
+
+class NewsItem(NamedTuple):
+    title: Optional[str]
+    url: Optional[str]
+    published: Optional[datetime]
+    summary: str
+    source: Optional[str]
+
 async def fetch_energy_news(
     query: str = "energy germany electricity gas emissions",
     max_records: int = 50,
     timespan: str = "24h"
-) -> List[Dict]:
+) -> List[NewsItem]:
     """
     Fetches energy-related news from GDELT Project API.
     
@@ -23,9 +36,14 @@ async def fetch_energy_news(
         timespan: Time window (e.g., '24h', '1w')
         
     Returns:
-        List of dictionaries containing news metadata.
+        List of NewsItem records containing news metadata.
     """
     
+    key = (query, max_records, timespan)
+    cached = _fetch_cache.get(key)
+    if cached is not None:
+        return cached
+
     params = {
         "query": query,
         "mode": "ArtList",
@@ -35,22 +53,37 @@ async def fetch_energy_news(
     }
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(GDELT_API_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+        response = await get_client().get(GDELT_API_URL, params=params)
+        response.raise_for_status()
+        data = response.json()
         
         if "articles" not in data:
             logger.warning("No articles found in GDELT response")
             return []
             
-        return parse_gdelt_response(data["articles"])
+        news_items = parse_gdelt_response(data["articles"])
+        _fetch_cache[key] = news_items
+        return news_items
         
     except Exception as e:
-        logger.error(f"Error fetching data from GDELT: {e}")
+        logger.error("Error fetching data from GDELT: %s", e)
         return []
 
-def parse_gdelt_response(articles: List[Dict]) -> List[Dict]:
+@lru_cache(maxsize=4096)
+def _parse_seendate(seendate: str) -> datetime:
+    """
+    Parses GDELT's fixed-shape "YYYYMMDDTHHMMSSZ" timestamps (UTC, returned naive)
+    by slicing, which is far cheaper than strptime or pandas for short lists.
+    Memoized: many articles in a batch share the same seendate.
+    """
+    if len(seendate) != 16 or seendate[8] != "T" or seendate[15] != "Z":
+        raise ValueError(seendate)
+    return datetime(
+        int(seendate[0:4]), int(seendate[4:6]), int(seendate[6:8]),
+        int(seendate[9:11]), int(seendate[11:13]), int(seendate[13:15])
+    )
+
+def parse_gdelt_response(articles: List[Dict]) -> List[NewsItem]:
     """
     Parses GDELT articles and normalizes them.
     """
@@ -62,16 +95,16 @@ def parse_gdelt_response(articles: List[Dict]) -> List[Dict]:
         published_dt = None
         if seendate:
             try:
-                published_dt = datetime.strptime(seendate, "%Y%m%dT%H%M%SZ")
+                published_dt = _parse_seendate(seendate)
             except ValueError:
-                logger.warning(f"Could not parse date: {seendate}")
+                logger.warning("Could not parse date: %s", seendate)
         
-        news_items.append({
-            "title": article.get("title"),
-            "url": article.get("url"),
-            "published": published_dt,
-            "summary": "", # GDELT ArtList mode doesn't always provide full summary, might need scraping or different mode
-            "source": article.get("sourcegeography") or article.get("domain")
-        })
+        news_items.append(NewsItem(
+            title=article.get("title"),
+            url=article.get("url"),
+            published=published_dt,
+            summary="", # GDELT ArtList mode doesn't always provide full summary, might need scraping or different mode
+            source=article.get("sourcegeography") or article.get("domain")
+        ))
         
     return news_items
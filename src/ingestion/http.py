@@ -0,0 +1,24 @@
+import httpx
+from typing import Optional
+
+# Shared client so keep-alive connections and DNS lookups are reused across fetches
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Returns the module-level AsyncClient used by the ingestion fetchers,
+    creating it on first use.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=5.0))
+    return _client
+
+async def close_client():
+    """
+    Closes the shared AsyncClient; the next fetch opens a new one.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,78 @@
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope="session")
+def client():
+    # Imported here so ingestion-only test runs don't load the API app
+    from app.main import app
+
+    # Entering the client runs startup/shutdown once for the whole session
+    with TestClient(app) as c:
+        yield c
+
+class ASGIResponse:
+    def __init__(self, status_code: int, body: bytes):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return orjson.loads(self.body)
+
+@pytest.fixture(scope="session")
+def get(client):
+    """
+    GET a path by calling the ASGI app directly with a hand-built scope,
+    skipping the HTTP client/codec layer. Runs on the TestClient's event loop,
+    so it shares the state set up at startup.
+    """
+    def _get(path: str, query_string: bytes = b"") -> ASGIResponse:
+        async def call():
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "root_path": "",
+                "query_string": query_string,
+                "headers": [(b"host", b"testserver")],
+                "client": ("testclient", 50000),
+                "server": ("testserver", 80),
+            }
+            status, chunks = None, []
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                elif message["type"] == "http.response.body":
+                    chunks.append(message.get("body", b""))
+
+            await client.app(scope, receive, send)
+            return ASGIResponse(status, b"".join(chunks))
+
+        return client.portal.call(call)
+
+    return _get
+
+# Insight routes are left out: their results are memoized per minute, so warming
+# them would make the insight tests check a cached object instead of the handler
+WARMUP_PATHS = ("/", "/health")
+
+@pytest.fixture(scope="session")
+def warm_routes(client, get):
+    """
+    Prime the route path map and hit the cheap routes once before the tests
+    run, so schema builds and dependency resolution happen up front.
+    """
+    for route in client.app.routes:
+        if not getattr(route, "param_convertors", None):
+            client.app.url_path_for(route.name)
+    for path in WARMUP_PATHS:
+        get(path)
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+from src.agent.features import rolling_stats
+
+def test_rolling_stats_partial_windows():
+    x = np.array([3.0, 1.0, 4.0, 1.0, 5.0])
+    stats = rolling_stats(x, 3)
+    assert stats.shape == (5, 4)
+    # Columns: mean, std, min, max over the trailing window
+    np.testing.assert_allclose(stats[0], [3.0, 0.0, 3.0, 3.0])
+    np.testing.assert_allclose(stats[1], [2.0, 1.0, 1.0, 3.0])
+    np.testing.assert_allclose(stats[2], [8.0 / 3, np.std([3.0, 1.0, 4.0]), 1.0, 4.0])
+    np.testing.assert_allclose(stats[4], [10.0 / 3, np.std([4.0, 1.0, 5.0]), 1.0, 5.0])
+
+def test_rolling_stats_window_longer_than_series():
+    stats = rolling_stats(np.arange(3.0), 6)
+    np.testing.assert_allclose(stats[:, 2], [0.0, 0.0, 0.0])
+    np.testing.assert_allclose(stats[:, 3], [0.0, 1.0, 2.0])
+    assert rolling_stats(np.array([]), 3).shape == (0, 4)
+
+def test_rolling_stats_rejects_empty_window():
+    with pytest.raises(ValueError):
+        rolling_stats(np.arange(3.0), 0)
@@ -1,5 +1,5 @@
 import pytest
-from datetime import datetime
+from datetime import datetime, timezone
 from src.ingestion.entsoe import parse_entsoe_xml
 from src.ingestion.gdelt import parse_gdelt_response
 
@@ -26,9 +26,64 @@ def test_parse_entsoe_xml():
     """
     prices = parse_entsoe_xml(xml_content)
     assert len(prices) == 1
-    assert prices[0]['price'] == 10.5
-    assert prices[0]['currency'] == 'EUR'
-    assert prices[0]['zone'] == 'DE-LU'
+    assert prices[0].price == 10.5
+    assert prices[0].currency == 'EUR'
+    assert prices[0].zone == 'DE-LU'
+
+def test_parse_entsoe_xml_resolutions_and_gaps():
+    # Two Periods (PT15M with position 3 missing, then PT30M) in one series
+    xml_content = b"""
+    <Publication_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:0">
+        <TimeSeries>
+            <currency_Unit.name>EUR</currency_Unit.name>
+            <price_Measure_Unit.name>MWH</price_Measure_Unit.name>
+            <Period>
+                <timeInterval>
+                    <start>2023-10-26T22:00Z</start>
+                    <end>2023-10-26T23:00Z</end>
+                </timeInterval>
+                <resolution>PT15M</resolution>
+                <Point>
+                    <position>1</position>
+                    <price.amount>10.0</price.amount>
+                </Point>
+                <Point>
+                    <position>2</position>
+                    <price.amount>11.0</price.amount>
+                </Point>
+                <Point>
+                    <position>4</position>
+                    <price.amount>13.0</price.amount>
+                </Point>
+            </Period>
+            <Period>
+                <timeInterval>
+                    <start>2023-10-27T22:00Z</start>
+                    <end>2023-10-27T23:00Z</end>
+                </timeInterval>
+                <resolution>PT30M</resolution>
+                <Point>
+                    <position>1</position>
+                    <price.amount>20.0</price.amount>
+                </Point>
+                <Point>
+                    <position>2</position>
+                    <price.amount>21.0</price.amount>
+                </Point>
+            </Period>
+        </TimeSeries>
+    </Publication_MarketDocument>
+    """
+    prices = parse_entsoe_xml(xml_content)
+    assert [p.timestamp for p in prices] == [
+        datetime(2023, 10, 26, 22, 0, tzinfo=timezone.utc),
+        datetime(2023, 10, 26, 22, 15, tzinfo=timezone.utc),
+        datetime(2023, 10, 26, 22, 45, tzinfo=timezone.utc),
+        datetime(2023, 10, 27, 22, 0, tzinfo=timezone.utc),
+        datetime(2023, 10, 27, 22, 30, tzinfo=timezone.utc),
+    ]
+    assert [p.price for p in prices] == [10.0, 11.0, 13.0, 20.0, 21.0]
+    assert all(p.currency == 'EUR' and p.unit == 'MWH' for p in prices)
 
 def test_parse_gdelt_response():
     mock_articles = [
@@ -41,5 +96,5 @@ def test_parse_gdelt_response():
     ]
     news = parse_gdelt_response(mock_articles)
     assert len(news) == 1
-    assert news[0]['title'] == "Energy Crisis"
-    assert news[0]['published'] == datetime(2023, 10, 27, 10, 30, 0)
+    assert news[0].title == "Energy Crisis"
+    assert news[0].published == datetime(2023, 10, 27, 10, 30, 0)
@@ -1,20 +1,20 @@
-from fastapi.testclient import TestClient
-from app.main import app
+import pytest
 
-client = TestClient(app)
+# Prime routes once per session before the tests run
+pytestmark = pytest.mark.usefixtures("warm_routes")
 
-def test_read_main():
-    response = client.get("/")
+def test_read_main(get):
+    response = get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Energy Trading Insight Agent is running"}
 
-def test_health_check():
-    response = client.get("/health")
+def test_health_check(get):
+    response = get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
-def test_smard_insights():
-    response = client.get("/insights/smard")
+def test_smard_insights(get):
+    response = get("/insights/smard")
     assert response.status_code == 200
     data = response.json()
     assert "summary" in data
@@ -22,8 +22,8 @@ def test_smard_insights():
     assert "confidence" in data
     assert data["action"] in ["BUY", "SELL", "HOLD"]
 
-def test_elexon_insights():
-    response = client.get("/insights/elexon")
+def test_elexon_insights(get):
+    response = get("/insights/elexon")
     assert response.status_code == 200
     data = response.json()
     assert "summary" in data